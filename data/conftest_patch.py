@@ -0,0 +1,7 @@
+# local-only plugin: stub the Biolink download for loader unit tests
+import pytest
+@pytest.fixture(autouse=True)
+def _no_bmt(monkeypatch):
+    import node_normalizer.loader.loader as l
+    anc = {"anatomical_entity": ["anatomical_entity", "biolink:NamedThing"]}
+    monkeypatch.setattr(l, "get_ancestors", lambda t: anc.get(t, [t, "biolink:NamedThing"]))
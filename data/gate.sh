@@ -0,0 +1,3 @@
+cd /root/package && python -m compileall -q node_normalizer tests load.py && timeout 600 python -m pytest -q -m "not integration" -p no:cacheprovider --ignore tests/frontend/test_norm.py --ignore tests/frontend/test_setid.py 2>&1 | tail -4
+echo "--- loader tests with bmt stubbed"
+PYTHONPATH=data timeout 600 python -m pytest -q -p no:cacheprovider -p conftest_patch tests/test_loader.py 2>&1 | tail -2
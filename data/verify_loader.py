@@ -0,0 +1,73 @@
+"""Local-only: run load_all against fakeredis and dump every db, to diff loader changes."""
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import fakeredis
+import yaml
+
+import node_normalizer.config as config_mod
+import node_normalizer.loader.loader as loader_mod
+
+RES = Path("/root/package/tests/resources")
+DBS = {"eq_id_to_id_db": 0, "id_to_eqids_db": 1, "id_to_type_db": 2, "curie_to_bl_type_db": 3,
+       "gene_protein_db": 4, "info_content_db": 5, "chemical_drug_db": 6}
+
+ANC = {
+    "biolink:Disease": ["biolink:Disease", "biolink:DiseaseOrPhenotypicFeature", "biolink:NamedThing"],
+    "biolink:PhenotypicFeature": ["biolink:PhenotypicFeature", "biolink:DiseaseOrPhenotypicFeature", "biolink:NamedThing"],
+    "biolink:Cell": ["biolink:Cell", "biolink:NamedThing"],
+    "biolink:Gene": ["biolink:Gene", "biolink:BiologicalEntity", "biolink:NamedThing"],
+    "biolink:Protein": ["biolink:Protein", "biolink:BiologicalEntity", "biolink:NamedThing"],
+}
+
+
+def main(out):
+    server = fakeredis.FakeServer()
+    clients = {}
+
+    def fake_connect(name):
+        return clients.setdefault(name, fakeredis.FakeStrictRedis(server=server, db=DBS[name], decode_responses=False))
+
+    tmp = Path(tempfile.mkdtemp())
+    (tmp / "DrugChemical.txt").write_text(json.dumps(["CHEBI:15377", "DRUGBANK:DB00898"]) + "\n")
+    (tmp / "GeneProtein.txt").write_text((RES / "GeneProtein.txt").read_text())
+    cfg = {"compendium_directory": str(RES), "conflation_directory": str(tmp), "biolink_version": "x", "test_mode": 0,
+           "data_files": ["Cell.txt", "Disease.txt", "PhenotypicFeature.txt", "Gene.txt", "Protein.txt"],
+           "conflations": [{"file": "DrugChemical.txt", "redis_db": "chemical_drug_db"},
+                           {"file": "GeneProtein.txt", "redis_db": "gene_protein_db"}]}
+    (tmp / "config.json").write_text(json.dumps(cfg))
+    (tmp / "redis_config.yaml").write_text(yaml.safe_dump({k: {"db": v, "hosts": [{"host_name": "x", "port": "1"}]} for k, v in DBS.items()}))
+
+    with patch.object(config_mod, "CONFIG_PATH", tmp / "config.json"), \
+            patch.object(loader_mod, "REDIS_CONFIG_PATH", tmp / "redis_config.yaml"), \
+            patch.object(loader_mod, "redis_connect", fake_connect), \
+            patch.object(loader_mod, "get_ancestors", lambda t: ANC[t]):
+        assert loader_mod.load_all(block_size=7)
+
+    dump = {}
+    for name, db in DBS.items():
+        r = fakeredis.FakeStrictRedis(server=server, db=db, decode_responses=True)
+        d = {}
+        for k in r.keys("*"):
+            t = r.type(k)
+            if t == "list":
+                d[k] = sorted(r.lrange(k, 0, -1))
+            elif t == "set":
+                d[k] = sorted(r.smembers(k))
+            else:
+                v = r.get(k)
+                try:
+                    v = json.loads(v)
+                except Exception:
+                    pass
+                d[k] = v
+        dump[name] = d
+    Path(out).write_text(json.dumps(dump, sort_keys=True, indent=1))
+    print({k: len(v) for k, v in dump.items()})
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -7,9 +7,18 @@ them here — in a module that does not move — means code that lives deeper in
 package (e.g. node_normalizer/loader/) does not have to reason about how many
 parent directories separate __file__ from the repo root.
 """
-import json
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+import yaml
+
+try:
+    # libyaml's C parser; PyYAML wheels normally ship it.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 # node_normalizer/ is one level below the repo root.
 REPO_ROOT = Path(__file__).parents[1]
 CONFIG_PATH = REPO_ROOT / "config.json"
@@ -18,6 +27,27 @@ RESOURCES_DIR = Path(__file__).parent / "resources"
 
 
 def get_config() -> dict:
-    """Load and return the parsed config.json."""
-    with open(CONFIG_PATH, "r") as config_file:
-        return json.load(config_file)
+    """
+    Return the parsed config.json. It is read once per path per process; the
+    returned dict is shared, so callers must not modify it.
+    """
+    # CONFIG_PATH is looked up at call time (tests repoint it), so the cache
+    # is keyed by the path rather than being a single cached value.
+    return _read_config(CONFIG_PATH)
+
+
+@lru_cache(maxsize=None)
+def _read_config(config_path: Path) -> dict:
+    with open(config_path, "rb") as config_file:
+        return orjson.loads(config_file.read())
+
+
+@lru_cache(maxsize=None)
+def read_yaml(yaml_path: Path) -> dict:
+    """
+    Return a parsed YAML config file (e.g. redis_config.yaml), safe-loaded with
+    the C parser when available. Each path is read once per process and the
+    returned dict is shared, so callers must not modify it.
+    """
+    with open(yaml_path, "rb") as yaml_file:
+        return yaml.load(yaml_file, Loader=_YamlLoader)
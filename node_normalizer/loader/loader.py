@@ -8,23 +8,35 @@ the loader Helm chart (which generates a single-file config.json per Kubernetes
 Job and runs `python load.py`); see documentation/Loader.md.
 """
 import json
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from itertools import islice
 from pathlib import Path
+from typing import DefaultDict
 
 import jsonschema
+import orjson
 import redis
-import yaml
+import zstandard
 from bmt import Toolkit
 from bmt.utils import format_element as bmt_format
 
-from ..config import get_config, REDIS_CONFIG_PATH, RESOURCES_DIR
+from ..config import get_config, read_yaml, REDIS_CONFIG_PATH, RESOURCES_DIR
 from ..util import LoggingUtil
 
 logger = LoggingUtil.init_logging()
 
+# Read buffer for compendium files, in bytes.
+COMPENDIUM_READ_BUFFER_SIZE = 4 * 1024 * 1024
+# Most key/value pairs sent in a single MSET; a block's buffer is split into
+# chunks of this size (see _write_block).
+MSET_CHUNK_SIZE = 10_000
+
 
 _toolkit = None
+_toolkit_lock = threading.Lock()
 
 
 def _get_toolkit() -> Toolkit:
@@ -37,38 +49,42 @@ def _get_toolkit() -> Toolkit:
     rather than whatever version bmt happens to default to.
     """
     global _toolkit
-    if _toolkit is None:
-        biolink_version = get_config()["biolink_version"]
-        url = f"https://raw.githubusercontent.com/biolink/biolink-model/{biolink_version}/biolink-model.yaml"
-        logger.info(f"Initializing Biolink Model Toolkit from {url}")
-        _toolkit = Toolkit(url)
+    # Compendia may load on several threads at once (see load_all); the lock
+    # keeps them from each downloading the model.
+    with _toolkit_lock:
+        if _toolkit is None:
+            biolink_version = get_config()["biolink_version"]
+            url = f"https://raw.githubusercontent.com/biolink/biolink-model/{biolink_version}/biolink-model.yaml"
+            logger.info(f"Initializing Biolink Model Toolkit from {url}")
+            _toolkit = Toolkit(url)
     return _toolkit
 
 
 @lru_cache(maxsize=None)
-def get_ancestors(input_type: str) -> list:
-    """Return the Biolink type and all its ancestors, formatted as CURIEs."""
+def get_ancestors(input_type: str) -> tuple:
+    """
+    Return the Biolink type and all its ancestors, formatted as CURIEs.
+
+    Memoized per type, so the Toolkit is only consulted the first time each
+    leaf type is seen in a load. A tuple, because every caller shares the one
+    cached value and must not be able to mutate it.
+    """
     ancestors = [bmt_format(a) for a in _get_toolkit().get_ancestors(input_type)]
     if input_type not in ancestors:
         ancestors = [input_type] + ancestors
-    return ancestors
+    return tuple(ancestors)
 
 
-def _accumulate_source_prefixes(source_prefixes: dict, identifiers: list, semantic_types: list) -> None:
+def _accumulate_source_prefixes(source_prefixes: DefaultDict[str, Counter], identifiers: list, semantic_types: tuple) -> None:
     """
     Fold one compendium line's CURIE-prefix counts into every implied semantic
     type. The prefixes are counted once for the line and then added to each
     ancestor bucket, rather than re-splitting every identifier once per type.
     """
-    line_prefix_counts: dict = {}
-    for equivalent_id in identifiers:
-        source_prefix = equivalent_id["i"].split(":", 1)[0]
-        line_prefix_counts[source_prefix] = line_prefix_counts.get(source_prefix, 0) + 1
+    line_prefix_counts = Counter(equivalent_id["i"].partition(":")[0] for equivalent_id in identifiers)
 
     for semantic_type in semantic_types:
-        type_counts = source_prefixes.setdefault(semantic_type, {})
-        for source_prefix, count in line_prefix_counts.items():
-            type_counts[source_prefix] = type_counts.get(source_prefix, 0) + count
+        source_prefixes[semantic_type].update(line_prefix_counts)
 
 
 @lru_cache(maxsize=None)
@@ -77,6 +93,18 @@ def _load_schema() -> dict:
         return json.load(schema_file)
 
 
+@lru_cache(maxsize=None)
+def _schema_validator() -> jsonschema.protocols.Validator:
+    """
+    Build the compendium validator once. jsonschema.validate() re-checks the
+    schema against its metaschema and builds a new validator on every call.
+    """
+    schema = _load_schema()
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
 @lru_cache(maxsize=None)
 def redis_connect(db_name: str) -> redis.Redis:
     """
@@ -84,8 +112,7 @@ def redis_connect(db_name: str) -> redis.Redis:
     redis_config.yaml. Cluster mode is no longer supported (see
     documentation/Redis.md).
     """
-    with open(REDIS_CONFIG_PATH) as config_file:
-        config = yaml.safe_load(config_file)[db_name]
+    config = read_yaml(REDIS_CONFIG_PATH)[db_name]
 
     if config.get("is_cluster"):
         raise ValueError(
@@ -94,13 +121,17 @@ def redis_connect(db_name: str) -> redis.Redis:
         )
 
     host = config["hosts"][0]
+    # decode_responses stays off: the load is almost entirely writes, so decoding
+    # every "OK" reply is wasted work, and the few values read back (the file-*
+    # metadata) go straight to orjson, which takes bytes. Keepalive because a
+    # connection can sit idle while a large block is being parsed.
     return redis.Redis(
         host=host["host_name"],
         port=int(host["port"]),
         db=config["db"],
         password=config.get("password") or None,
         ssl=config.get("ssl_enabled", False),
-        decode_responses=True,
+        socket_keepalive=True,
     )
 
 
@@ -121,8 +152,7 @@ def disable_periodic_save() -> None:
     Redis) is logged and skipped rather than failing the load. CONFIG SET save
     is server-wide, so this hits each backend instance once.
     """
-    with open(REDIS_CONFIG_PATH) as config_file:
-        db_names = list(yaml.safe_load(config_file).keys())
+    db_names = list(read_yaml(REDIS_CONFIG_PATH).keys())
 
     for db_name in db_names:
         try:
@@ -134,13 +164,15 @@ def disable_periodic_save() -> None:
 
 def validate_compendium(in_file) -> bool:
     """Validate the first few lines of a compendium against the data schema."""
-    schema = _load_schema()
-    with open(in_file, "r") as compendium:
+    validator = _schema_validator()
+    # Parsed exactly as load_compendium will parse it: bytes through orjson.
+    # Default buffering, since only the first few lines are read.
+    with open(in_file, "rb") as compendium:
         logger.info(f"Validating {in_file}...")
         for line in islice(compendium, 5):
             try:
-                instance = json.loads(line)
-                jsonschema.validate(instance=instance, schema=schema)
+                instance = orjson.loads(line)
+                validator.validate(instance)
             except Exception as e:
                 logger.error(f"Exception thrown in validate_compendium({in_file}): {e}")
                 return False
@@ -156,7 +188,26 @@ def get_compendia(compendium_directory: Path, data_files: list) -> list:
     return file_list
 
 
-def load_compendium(compendium_filename, block_size: int, test_mode: int = 0) -> dict:
+def _write_block(writes: list) -> None:
+    """
+    Write one finished block: an MSET per (redis client, {key: value} buffer)
+    pair. A buffer larger than MSET_CHUNK_SIZE is split into several MSETs sent
+    in one non-transactional pipeline, so no single command (and the time the
+    single-threaded server spends executing it) grows with the block size.
+    """
+    for redis_client, buffer in writes:
+        if len(buffer) <= MSET_CHUNK_SIZE:
+            if buffer:
+                redis_client.mset(buffer)
+            continue
+        pipeline = redis_client.pipeline(transaction=False)
+        items = iter(buffer.items())
+        while chunk := dict(islice(items, MSET_CHUNK_SIZE)):
+            pipeline.mset(chunk)
+        pipeline.execute()
+
+
+def load_compendium(compendium_filename, block_size: int, test_mode: int = 0, compress_eqids: bool = False) -> dict:
     """
     Load a single compendium into Redis. Writes:
       eq_id_to_id_db:   UPPER(equivalent id) -> canonical id
@@ -165,71 +216,96 @@ def load_compendium(compendium_filename, block_size: int, test_mode: int = 0) ->
       info_content_db:  canonical id -> clique properties JSON {"preferred_name", "ic"}
     (info_content_db is being grown into a general clique-property store; see #306.
     It formerly held a bare information-content float, so readers must tolerate both.)
+    With compress_eqids, the id_to_eqids_db JSON is stored zstd-compressed (see
+    documentation/Redis.md); the frontend reads either form.
     Returns the per-type source-prefix counts accumulated from this file.
     """
-    source_prefixes: dict = {}
+    source_prefixes: DefaultDict[str, Counter] = defaultdict(Counter)
 
     term2id_redis = redis_connect("eq_id_to_id_db")
     id2eqids_redis = redis_connect("id_to_eqids_db")
     id2type_redis = redis_connect("id_to_type_db")
     info_content_redis = redis_connect("info_content_db")
 
-    # transaction=False: this is a bulk load, not an atomic update, so skip the
-    # MULTI/EXEC framing around every flushed block.
-    term2id_pipeline = term2id_redis.pipeline(transaction=False)
-    id2eqids_pipeline = id2eqids_redis.pipeline(transaction=False)
-    id2type_pipeline = id2type_redis.pipeline(transaction=False)
-    info_content_pipeline = info_content_redis.pipeline(transaction=False)
+    # Each block's writes are buffered as {key: value} and sent as one MSET per
+    # database, rather than one SET command per key. A dict keeps the last value
+    # for a repeated key, exactly as a sequence of SETs would.
+    term2id_buffer: dict = {}
+    id2eqids_buffer: dict = {}
+    id2type_buffer: dict = {}
+    info_content_buffer: dict = {}
+
+    # ZstdCompressor objects are not thread-safe, and compendia can load on
+    # several threads at once, so each load gets its own.
+    eqids_compressor = zstandard.ZstdCompressor(level=3) if compress_eqids else None
 
     line_counter = 0
-    with open(compendium_filename, "r", encoding="utf-8") as compendium:
+    # A single background writer sends each finished block while this thread
+    # reads and parses the next one, so file I/O and JSON decoding overlap with
+    # the Redis round trips. At most one block is in flight (we wait for it
+    # before handing over the next), which bounds memory at two blocks.
+    pending_write = None
+    # Binary mode: orjson parses the raw bytes, so there is no point decoding
+    # every line to str first. The large buffer cuts read() syscalls on the
+    # multi-GB compendia (the default is 8 KiB).
+    with ThreadPoolExecutor(max_workers=1) as writer, \
+            open(compendium_filename, "rb", buffering=COMPENDIUM_READ_BUFFER_SIZE) as compendium:
         logger.info(f"Processing {compendium_filename}...")
 
         for line in compendium:
             line_counter += 1
-            instance = json.loads(line)
+            instance = orjson.loads(line)
+            identifiers = instance["identifiers"]
 
             # "The" identifier is the first one in the presorted identifiers list.
-            identifier = instance["identifiers"][0]["i"]
+            identifier = identifiers[0]["i"]
 
             # We only keep the leaf type in the file (and redis), but we accumulate
             # prefix statistics for each implied (ancestor) type as well.
             semantic_types = get_ancestors(instance["type"])
 
             # Accumulate prefix statistics for the leaf type and every ancestor.
-            _accumulate_source_prefixes(source_prefixes, instance["identifiers"], semantic_types)
+            _accumulate_source_prefixes(source_prefixes, identifiers, semantic_types)
 
             # The Redis writes are independent of the semantic type, so do them
             # once per line rather than once per ancestor.
-            for equivalent_id in instance["identifiers"]:
-                term2id_pipeline.set(equivalent_id["i"].upper(), identifier)
-            id2eqids_pipeline.set(identifier, json.dumps(instance["identifiers"]))
-            id2type_pipeline.set(identifier, instance["type"])
+            for equivalent_id in identifiers:
+                term2id_buffer[equivalent_id["i"].upper()] = identifier
+            eqids_json = orjson.dumps(identifiers)
+            id2eqids_buffer[identifier] = eqids_compressor.compress(eqids_json) if eqids_compressor else eqids_json
+            id2type_buffer[identifier] = instance["type"]
             # Clique-level properties, keyed by canonical id. Every clique gets one
             # (unlike the old IC-only write, which skipped cliques without an "ic").
             props = {"preferred_name": instance.get("preferred_name", "")}
             if instance.get("ic") is not None:
                 props["ic"] = instance["ic"]
-            info_content_pipeline.set(identifier, json.dumps(props))
+            info_content_buffer[identifier] = orjson.dumps(props)
 
             if test_mode != 1 and line_counter % block_size == 0:
-                term2id_pipeline.execute()
-                id2eqids_pipeline.execute()
-                id2type_pipeline.execute()
-                info_content_pipeline.execute()
-
-                term2id_pipeline = term2id_redis.pipeline(transaction=False)
-                id2eqids_pipeline = id2eqids_redis.pipeline(transaction=False)
-                id2type_pipeline = id2type_redis.pipeline(transaction=False)
-                info_content_pipeline = info_content_redis.pipeline(transaction=False)
+                if pending_write is not None:
+                    # Re-raises here if the previous block failed to write.
+                    pending_write.result()
+                pending_write = writer.submit(_write_block, [
+                    (term2id_redis, term2id_buffer),
+                    (id2eqids_redis, id2eqids_buffer),
+                    (id2type_redis, id2type_buffer),
+                    (info_content_redis, info_content_buffer),
+                ])
+                # The writer owns the old buffers now; start fresh ones.
+                term2id_buffer, id2eqids_buffer, id2type_buffer, info_content_buffer = {}, {}, {}, {}
 
                 logger.info(f"{line_counter} {compendium_filename} lines processed")
 
+        if pending_write is not None:
+            pending_write.result()
+
         if test_mode != 1:
-            term2id_pipeline.execute()
-            id2eqids_pipeline.execute()
-            id2type_pipeline.execute()
-            info_content_pipeline.execute()
+            _write_block([
+                (term2id_redis, term2id_buffer),
+                (id2eqids_redis, id2eqids_buffer),
+                (id2type_redis, id2type_buffer),
+                (info_content_redis, info_content_buffer),
+            ])
             logger.info(f"{line_counter} {compendium_filename} total lines processed")
 
         if line_counter == 0:
@@ -237,7 +313,7 @@ def load_compendium(compendium_filename, block_size: int, test_mode: int = 0) ->
 
         print(f"Done loading {compendium_filename}...")
 
-    return source_prefixes
+    return {semantic_type: dict(counts) for semantic_type, counts in source_prefixes.items()}
 
 
 def load_conflation(conflation: dict, conflation_directory: Path, block_size: int, test_mode: int = 0) -> None:
@@ -247,12 +323,14 @@ def load_conflation(conflation: dict, conflation_directory: Path, block_size: in
     conflation_pipeline = conflation_redis.pipeline(transaction=False)
 
     line_counter = 0
-    with open(f"{conflation_directory}/{conflation_file}", "r", encoding="utf-8") as cfile:
+    # Binary mode, as in load_compendium: orjson parses the bytes directly, and
+    # the raw line is what gets stored, so it never needs decoding to str.
+    with open(f"{conflation_directory}/{conflation_file}", "rb", buffering=COMPENDIUM_READ_BUFFER_SIZE) as cfile:
         logger.info(f"Processing {conflation_file}...")
 
         for line in cfile:
             line_counter += 1
-            instance = json.loads(line)
+            instance = orjson.loads(line)
 
             for identifier in instance:
                 conflation_pipeline.set(identifier, line)
@@ -275,43 +353,55 @@ def load_conflation(conflation: dict, conflation_directory: Path, block_size: in
 def merge_semantic_meta_data(test_mode: int = 0) -> None:
     """
     Sum the per-file source-prefix counts written during compendium loading into
-    the aggregate `semantic_types` list and per-type prefix-count keys that the
+    the aggregate `semantic_types` set and per-type prefix-count keys that the
     frontend serves from curie_to_bl_type_db.
     """
     types_prefixes_redis = redis_connect("curie_to_bl_type_db")
 
     meta_data_keys = types_prefixes_redis.keys("file-*")
 
-    pipeline = types_prefixes_redis.pipeline(transaction=False)
-    for meta_data_key in meta_data_keys:
-        pipeline.get(meta_data_key)
-    meta_data = pipeline.execute()
+    # One MGET for every per-file entry (MGET with no keys is an error).
+    meta_data = types_prefixes_redis.mget(meta_data_keys) if meta_data_keys else []
 
     all_meta_data = {}
     for meta_data_key, meta_datum in zip(meta_data_keys, meta_data):
         if meta_datum:
-            all_meta_data[meta_data_key] = json.loads(meta_datum)
+            all_meta_data[meta_data_key] = orjson.loads(meta_datum)
 
-    sources_prefix: dict = {}
+    sources_prefix: DefaultDict[str, Counter] = defaultdict(Counter)
     for data in all_meta_data.values():
         for bl_type, curie_counts in data["source_prefixes"].items():
-            sources_prefix.setdefault(bl_type, {})
-            for curie_prefix, count in curie_counts.items():
-                sources_prefix[bl_type][curie_prefix] = sources_prefix[bl_type].get(curie_prefix, 0) + count
+            sources_prefix[bl_type].update(curie_counts)
+
+    # semantic_types is a SET, so running this once per file no longer piles up
+    # one copy of every type per file. Databases loaded before that stored a
+    # LIST, which SADD would reject with WRONGTYPE; replace it (every type in it
+    # comes from a file-* key, so it is re-added below).
+    replace_legacy_list = (
+        test_mode != 1
+        and sources_prefix
+        and types_prefixes_redis.type("semantic_types") == b"list"
+    )
 
-    pipeline = types_prefixes_redis.pipeline(transaction=False)
+    # A transaction, unlike the loader's other pipelines: a live frontend must
+    # never see the gap between deleting a legacy LIST and the SADD that
+    # replaces it (it would answer 404 for the semantic types).
+    pipeline = types_prefixes_redis.pipeline(transaction=True)
+    if replace_legacy_list:
+        pipeline.delete("semantic_types")
     if sources_prefix:
-        pipeline.lpush("semantic_types", *list(sources_prefix.keys()))
+        pipeline.sadd("semantic_types", *sources_prefix)
     for bl_type, counts in sources_prefix.items():
-        pipeline.set(bl_type, json.dumps(counts))
+        pipeline.set(bl_type, orjson.dumps(counts))
 
     if test_mode != 1:
         pipeline.execute()
 
 
-def load_all(block_size: int = 100_000) -> bool:
+def load_all(block_size: int = 100_000, max_parallel_compendia: int = 4) -> bool:
     """
     Load every compendium and conflation named in config.json into Redis.
+    Up to `max_parallel_compendia` compendia are loaded at once.
     Returns True on success.
     """
     config = get_config()
@@ -320,6 +410,7 @@ def load_all(block_size: int = 100_000) -> bool:
     test_mode = config["test_mode"]
     data_files = config["data_files"]
     conflations = config["conflations"]
+    compress_eqids = config.get("compress_eqids", False)
 
     if test_mode == 1:
         logger.debug("Test mode enabled. No data will be produced.")
@@ -329,19 +420,25 @@ def load_all(block_size: int = 100_000) -> bool:
     # Raises FileNotFoundError if any named compendium is missing.
     compendia = get_compendia(compendium_directory, data_files)
 
-    types_prefixes_redis = redis_connect("curie_to_bl_type_db")
+    valid_compendia = []
     for comp in compendia:
         if not validate_compendium(comp):
             logger.warning(f"Compendia file {comp} is invalid.")
             continue
+        valid_compendia.append(comp)
 
-        source_prefixes = load_compendium(comp, block_size, test_mode)
-
-        pipeline = types_prefixes_redis.pipeline(transaction=False)
-        # @TODO add meta data about files eg. checksum to this object
-        pipeline.set(f"file-{comp}", json.dumps({"source_prefixes": source_prefixes}))
-        if test_mode != 1:
-            pipeline.execute()
+    # Babel cliques never span compendia, so each file writes its own keys and
+    # several can load side by side. (The loader Helm chart runs one file per
+    # Job, so this only matters for multi-file configs such as local loads.)
+    types_prefixes_redis = redis_connect("curie_to_bl_type_db")
+    with ThreadPoolExecutor(max_workers=max_parallel_compendia) as executor:
+        loads = executor.map(lambda comp: load_compendium(comp, block_size, test_mode, compress_eqids), valid_compendia)
+        for comp, source_prefixes in zip(valid_compendia, loads):
+            pipeline = types_prefixes_redis.pipeline(transaction=False)
+            # @TODO add meta data about files eg. checksum to this object
+            pipeline.set(f"file-{comp}", orjson.dumps({"source_prefixes": source_prefixes}))
+            if test_mode != 1:
+                pipeline.execute()
 
     for conf in conflations:
         load_conflation(conf, conflation_directory, block_size, test_mode)
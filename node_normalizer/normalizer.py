@@ -5,6 +5,7 @@ from pathlib import Path
 import time
 
 import orjson as json
+import zstandard
 import logging
 import os
 import uuid
@@ -47,6 +48,23 @@ def _clique_props(raw) -> dict:
     return value if isinstance(value, dict) else {"ic": value}
 
 
+# id_to_eqids_db values are JSON, zstd-compressed when the loader ran with
+# "compress_eqids"; a zstd frame always starts with this magic number.
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+def _eqids_value(raw) -> list:
+    """
+    Parse a value from id_to_eqids_db (db 1). Loads with "compress_eqids" set in
+    config.json store zstd-compressed JSON; every other load stores plain JSON.
+    Accept both, so the frontend works against either kind of database.
+    """
+    if raw[:4] == ZSTD_MAGIC:
+        raw = _zstd_decompressor.decompress(raw)
+    return json.loads(raw)
+
+
 def sort_identifiers_with_boosted_prefixes(identifiers, prefixes):
     """
     Given a list of identifiers (with `identifier` and `label` keys), sort them using
@@ -524,8 +542,9 @@ async def get_eqids_and_types(
     batch_size = int(os.environ.get("EQ_BATCH_SIZE", 2500))
     eqids = []
     for i in range(0, len(canonical_nonan), batch_size):
-        eqids += await app.state.id_to_eqids_db.mget(*canonical_nonan[i:i + batch_size], encoding='utf-8')
-    eqids = [json.loads(value) if value is not None else [None] for value in eqids]
+        # Raw bytes: the values may be zstd-compressed (see _eqids_value).
+        eqids += await app.state.id_to_eqids_db.mget(*canonical_nonan[i:i + batch_size], encoding=None)
+    eqids = [_eqids_value(value) if value is not None else [None] for value in eqids]
     types = await app.state.id_to_type_db.mget(*canonical_nonan, encoding='utf-8')
     types_with_ancestors = []
     for index, typ in enumerate(types):
@@ -894,6 +913,35 @@ async def create_node(app, canonical_id, equivalent_ids, types, info_contents, p
     return node
 
 
+# How long semantic_types is served from memory before it is re-read.
+# It only changes when the backend is reloaded, so a short TTL costs nothing.
+SEMANTIC_TYPES_TTL = 60  # seconds
+
+
+async def get_semantic_types(app: FastAPI) -> Set[str]:
+    """
+    Return the distinct Biolink types the loader recorded in curie_to_bl_type_db,
+    cached on app.state for SEMANTIC_TYPES_TTL seconds rather than read on every
+    request. An empty result is not cached, so a freshly restored database is
+    picked up immediately.
+    """
+    now = time.monotonic()
+    if app.state.semantic_types is None or now >= app.state.semantic_types_expire:
+        db = app.state.curie_to_bl_type_db
+        # The loader stores semantic_types as a SET. Databases loaded before that
+        # change (including ones restored from their RDB backups) have a LIST
+        # holding one copy of every type per file; read either.
+        if await db.type('semantic_types') == 'list':
+            types = set(await db.lrange('semantic_types', 0, -1, encoding='utf-8'))
+        else:
+            types = set(await db.smembers('semantic_types', encoding='utf-8'))
+        if not types:
+            return types
+        app.state.semantic_types = types
+        app.state.semantic_types_expire = now + SEMANTIC_TYPES_TTL
+    return app.state.semantic_types
+
+
 async def get_curie_prefixes(
         app: FastAPI,
         semantic_types: Optional[List[str]] = None
@@ -918,9 +966,7 @@ async def get_curie_prefixes(
             # set the return data
             ret_val[item] = {'curie_prefix': curies}
     else:
-        # The loader LPUSHes into the semantic_types list once per file, so it
-        # contains many duplicates; dedupe before querying each type.
-        types = set(await app.state.curie_to_bl_type_db.lrange('semantic_types', 0, -1, encoding='utf-8'))
+        types = await get_semantic_types(app)
 
         for item in types:
             # get the curies for this type
@@ -2,6 +2,8 @@ from dataclasses import dataclass, field
 import aioredis
 from typing import List, Dict
 
+from .config import read_yaml
+
 
 @dataclass
 class Resource:
@@ -122,6 +124,18 @@ class RedisConnection:
         """
         return await self.connector.lrange(key=key, start=start, stop=stop, encoding=encoding)
 
+    async def smembers(self, key, encoding='utf-8'):
+        """
+        Execute smembers command.
+        """
+        return await self.connector.smembers(key, encoding=encoding)
+
+    async def type(self, key):
+        """
+        Execute type command, returning the type name as a str (e.g. 'list', 'set', 'none').
+        """
+        return await self.connector.execute(b'TYPE', key, encoding='utf-8')
+
     def pipeline(self):
         return self.connector.pipeline()
 
@@ -147,16 +161,14 @@ class RedisConnectionFactory:
 
     @staticmethod
     def get_config(file_name) -> ConnectionConfig:
-        import yaml
-        with open(file_name) as f:
-            config = ConnectionConfig(yaml.load(f, yaml.FullLoader))
-        return config
+        return ConnectionConfig(read_yaml(file_name))
 
     @classmethod
     async def create_connection_pool(cls, config_file_path):
-        config = RedisConnectionFactory.get_config(config_file_path)
         self = RedisConnectionFactory()
+        # Connections are shared process-wide; only the first call reads the config.
         if not RedisConnectionFactory.connections:
+            config = RedisConnectionFactory.get_config(config_file_path)
             RedisConnectionFactory.connections = {
                 connection_name: await RedisConnection.create(config.__getattr__(connection_name))
                 for connection_name in config.get_connection_names()
@@ -12,12 +12,12 @@ from requests.adapters import HTTPAdapter, Retry
 import fastapi
 from fastapi import FastAPI, HTTPException, Body, Query
 import reasoner_pydantic
-import yaml
 from pydantic import BaseModel
 from bmt import Toolkit
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from .apidocs import get_app_info, construct_open_api_schema
+from .config import read_yaml
 from .model import (
     SemanticTypes,
     CuriePivot,
@@ -27,7 +27,7 @@ from .model import (
     SetIDResponse,
     SetIDQuery,
 )
-from .normalizer import get_normalized_nodes, get_curie_prefixes, normalize_message
+from .normalizer import get_normalized_nodes, get_curie_prefixes, get_semantic_types, normalize_message
 from .set_id import generate_setid
 from .redis_adapter import RedisConnectionFactory
 from .util import LoggingUtil
@@ -70,6 +70,8 @@ async def startup_event():
     app.state.toolkit = Toolkit(BIOLINK_MODEL_URL)
     logger.info(f"Initialized Biolink Model Toolkit ({app.state.toolkit}) from {BIOLINK_MODEL_URL} (based on tag: {BIOLINK_MODEL_TAG}).")
     app.state.ancestor_map = {}
+    app.state.semantic_types = None
+    app.state.semantic_types_expire = 0.0
 
 
 @app.on_event("shutdown")
@@ -105,10 +107,8 @@ async def status_get() -> Dict:
 
 async def status() -> Dict:
     """ Return status information about this NodeNorm instance as well as its databases. """
-    redis_config_file = Path(__file__).parent.parent / "redis_config.yaml"
-    with open(redis_config_file, 'r') as rcfile:
-        # Load rcfile as a YAML file using safe loading.
-        redis_config = yaml.safe_load(rcfile)
+    # Cached: the connections were built from this same file at startup.
+    redis_config = read_yaml(Path(__file__).parent.parent / "redis_config.yaml")
 
     # Do we know the Babel version and version URL? It will be stored in an environmental variable if we do.
     babel_version = os.environ.get("BABEL_VERSION", "unknown")
@@ -182,19 +182,23 @@ async def status() -> Dict:
     summary="Normalizes a TRAPI response object",
     description="Returns the response object with a merged knowledge graph and query graph bindings",
     response_model=reasoner_pydantic.Query,
-    response_model_exclude_none=True,
-    response_model_exclude_unset=True,
     deprecated=True,
 )
 async def query(query: Annotated[reasoner_pydantic.Query, Body(openapi_examples={"Drugs that treat essential hypertension": {
     "summary": "A result from a query for drugs that treat essential hypertension.",
     "value": EXAMPLE_QUERY_DRUG_TREATS_ESSENTIAL_HYPERTENSION,
-}})]) -> reasoner_pydantic.Query:
+}})]) -> Response:
     """
     Normalizes a TRAPI compliant knowledge graph
     """
     query.message = await normalize_message(app, query.message)
-    return query
+    # Serialize the model ourselves: returning it would have FastAPI re-validate
+    # the whole (possibly very large) message against response_model and then
+    # walk it again in jsonable_encoder. response_model still documents the shape.
+    return Response(
+        content=query.json(by_alias=True, exclude_none=True, exclude_unset=True),
+        media_type="application/json",
+    )
 
 
 @app.post(
@@ -371,7 +375,7 @@ async def get_setid(
 )
 async def get_semantic_types_handler() -> SemanticTypes:
     # look for all biolink semantic types
-    types = await app.state.curie_to_bl_type_db.lrange("semantic_types", 0, -1, encoding="utf-8")
+    types = await get_semantic_types(app)
 
     # did we get any data
     if not types:
@@ -379,7 +383,7 @@ async def get_semantic_types_handler() -> SemanticTypes:
 
     # get the distinct list of Biolink model types in the correct format
     # https://github.com/NCATSTranslator/NodeNormalization/issues/29
-    ret_val = SemanticTypes(semantic_types={"types": list(set(types))})
+    ret_val = SemanticTypes(semantic_types={"types": list(types)})
 
     # return the data to the caller
     return ret_val
@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 from logging.config import dictConfig
 from logging.handlers import RotatingFileHandler
 from fastapi.logger import logger as fastapi_logger
@@ -7,30 +8,36 @@ from fastapi.logger import logger as fastapi_logger
 # Some constants.
 BIOLINK_NAMED_THING = "biolink:NamedThing"
 
+# A CURIE whose suffix (everything after the first colon) is all digits.
+_NUMERICAL_CURIE_SUFFIX = re.compile(r"[^:]*:(\d+)")
+
 def get_numerical_curie_suffix(curie):
     """
     If a CURIE has a numerical suffix, return it as an integer. Otherwise return None.
     :param curie: A CURIE.
-    :return: An integer if the CURIE suffix is castable to int, otherwise None.
+    :return: An integer if the CURIE suffix is all digits, otherwise None (including
+        for a string with no colon at all).
     """
-    curie_parts = curie.split(":", 1)
-    if len(curie_parts) > 0:
-        # Try to cast the CURIE suffix to an integer. If we get a ValueError, don't worry about it.
-        try:
-            return int(curie_parts[1])
-        except ValueError:
-            pass
-    return None
+    match = _NUMERICAL_CURIE_SUFFIX.fullmatch(curie)
+    return int(match.group(1)) if match else None
 
-# loggers = {}
 class LoggingUtil(object):
     """ Logging utility controlling format and setting initial logging level """
+    # Loggers already set up, keyed by (log_file_path, log_file_level). Every module
+    # calls init_logging() at import; without this each call re-ran dictConfig,
+    # tearing down and rebuilding the "node-norm" handlers (and any file handler).
+    _configured = {}
+
     @staticmethod
     def init_logging(log_file_path=None, log_file_level=None):
         # If log_file_path is set, we use that. Otherwise, we use the LOG_LEVEL environmental variable.
         if not log_file_level:
             log_file_level = os.getenv("LOG_LEVEL", "INFO")
 
+        key = (log_file_path, log_file_level)
+        if key in LoggingUtil._configured:
+            return LoggingUtil._configured[key]
+
         dictConfig({
             "version": 1,
             "disable_existing_loggers": False,
@@ -66,11 +73,12 @@ class LoggingUtil(object):
             # add the handler to the logger
             logger.addHandler(file_handler)
 
+        LoggingUtil._configured[key] = logger
+
         # return to the caller
         return logger
 
 
 def uniquify_list(seq):
-    seen = set()
-    seen_add = seen.add
-    return [x for x in seq if not (x in seen or seen_add(x))]
\ No newline at end of file
+    # Dicts keep insertion order, so this drops repeats and keeps first occurrences.
+    return list(dict.fromkeys(seq))
\ No newline at end of file
@@ -14,7 +14,7 @@ class MockRedis:
         self.data = data
 
     async def mget(self, *args, **kwargs):
-        return [self.data[x] if x in self.data else None for x in args]
+        return list(map(self.data.get, args))
 
 
 # Id -> Canonical
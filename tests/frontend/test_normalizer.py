@@ -20,8 +20,10 @@ from node_normalizer.normalizer import (
     _hash_attributes,
     _merge_node_attributes,
     _clique_props,
+    _eqids_value,
     create_node,
     get_normalized_nodes,
+    get_semantic_types,
 )
 
 
@@ -239,6 +241,64 @@ class TestNormalizer:
         # Missing/absent value -> empty dict.
         assert _clique_props(None) == {}
 
+    def test_eqids_value(self):
+        # id_to_eqids_db holds plain JSON (str or bytes) or, for loads with
+        # compress_eqids, zstd-compressed JSON. All three parse the same.
+        import zstandard
+
+        eqids = [{"i": "MONDO:0005002", "l": "COPD"}, {"i": "DOID:3083"}]
+        plain = json.dumps(eqids)
+        assert _eqids_value(plain) == eqids
+        assert _eqids_value(plain.encode("utf-8")) == eqids
+        assert _eqids_value(zstandard.ZstdCompressor(level=3).compress(plain.encode("utf-8"))) == eqids
+
+    @pytest.mark.asyncio
+    async def test_get_semantic_types_is_cached(self):
+        # The deduplicated types are read from Redis once and then served from
+        # app.state until the TTL runs out; an empty result is never cached.
+        class _SetRedis:
+            def __init__(self, values):
+                self.values = values
+                self.calls = 0
+
+            async def type(self, key):
+                return "set" if self.values else "none"
+
+            async def smembers(self, key, encoding="utf-8"):
+                self.calls += 1
+                return self.values
+
+        db = _SetRedis([])
+        app = SimpleNamespace(state=SimpleNamespace(
+            curie_to_bl_type_db=db, semantic_types=None, semantic_types_expire=0.0,
+        ))
+
+        assert await get_semantic_types(app) == set()
+        db.values = ["biolink:Gene", "biolink:Gene", "biolink:Protein"]
+        assert await get_semantic_types(app) == {"biolink:Gene", "biolink:Protein"}
+        assert await get_semantic_types(app) == {"biolink:Gene", "biolink:Protein"}
+        assert db.calls == 2
+
+        app.state.semantic_types_expire = 0.0
+        await get_semantic_types(app)
+        assert db.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_get_semantic_types_reads_legacy_list(self):
+        # Databases loaded before semantic_types became a SET hold a LIST with
+        # one copy of each type per file; it must still be read and deduped.
+        class _LegacyListRedis:
+            async def type(self, key):
+                return "list"
+
+            async def lrange(self, key, start, stop, encoding="utf-8"):
+                return ["biolink:Gene", "biolink:Protein", "biolink:Gene"]
+
+        app = SimpleNamespace(state=SimpleNamespace(
+            curie_to_bl_type_db=_LegacyListRedis(), semantic_types=None, semantic_types_expire=0.0,
+        ))
+        assert await get_semantic_types(app) == {"biolink:Gene", "biolink:Protein"}
+
     @pytest.mark.asyncio
     async def test_create_node_uses_stored_preferred_name(self):
         # When a Babel-computed preferred_name is present, create_node uses it verbatim
@@ -0,0 +1,40 @@
+"""Test the /query endpoint's response serialization."""
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import reasoner_pydantic
+from fastapi.routing import serialize_response
+
+from node_normalizer import server
+
+premerged_response = Path(__file__).parent.parent / "resources" / "premerged_response.json"
+
+
+async def _unchanged_message(app, message):
+    return message
+
+
+@pytest.mark.asyncio
+async def test_query_body_matches_fastapi_serialization():
+    """/query serializes the model itself; the body must be what FastAPI's
+    response_model path (with exclude_none and exclude_unset) used to send."""
+    with open(premerged_response, "r") as pre:
+        premerged_data = json.load(pre)
+    # An explicit null, so that exclude_none is exercised as well as exclude_unset.
+    premerged_data["message"]["knowledge_graph"]["nodes"]["HGNC:11603"]["name"] = None
+
+    route = next(r for r in server.app.routes if getattr(r, "path", None) == "/query")
+    expected = await serialize_response(
+        field=route.secure_cloned_response_field,
+        response_content=reasoner_pydantic.Query.parse_obj(premerged_data),
+        exclude_none=True,
+        exclude_unset=True,
+    )
+
+    with patch.object(server, "normalize_message", _unchanged_message):
+        response = await server.query(reasoner_pydantic.Query.parse_obj(premerged_data))
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == expected
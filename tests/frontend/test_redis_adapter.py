@@ -100,6 +100,16 @@ class aioredisMock:
         assert encoding == 'utf-8'
         return "called"
 
+    async def smembers(self, key, encoding='utf-8'):
+        assert encoding == 'utf-8'
+        return "smembers called"
+
+    async def execute(self, command, *args, encoding=None):
+        # aioredis returns bytes unless an encoding is given.
+        assert command == b'TYPE'
+        reply = b'set'
+        return reply.decode(encoding) if encoding else reply
+
     def close(self):
         self.closed = True
 
@@ -152,6 +162,12 @@ async def test_redis_aioredis_connection():
                 "encoding": 'utf-8'
             }
             assert await mocked_connection.lrange(**kwargs) == await connection.lrange(**kwargs)
+            # test smembers
+            assert await mocked_connection.smembers("someKey") == await connection.smembers("someKey")
+            # test type: decoded to a str, so callers can compare against 'list'/'set'
+            key_type = await connection.type("someKey")
+            assert isinstance(key_type, str)
+            assert key_type == 'set'
 
             # test close
             connection.close()
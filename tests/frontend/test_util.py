@@ -0,0 +1,24 @@
+"""Test node_normalizer util.py"""
+from node_normalizer.util import LoggingUtil, get_numerical_curie_suffix, uniquify_list
+
+
+def test_get_numerical_curie_suffix():
+    assert get_numerical_curie_suffix("NCBITaxon:9606") == 9606
+    assert get_numerical_curie_suffix("MONDO:0005002") == 5002
+    # Non-numeric suffixes, extra colons and colon-less strings have no numerical suffix.
+    assert get_numerical_curie_suffix("CHEBI:15377a") is None
+    assert get_numerical_curie_suffix("A:B:12") is None
+    assert get_numerical_curie_suffix("NCBITaxon") is None
+
+
+def test_uniquify_list_keeps_first_occurrence_order():
+    assert uniquify_list(["biolink:Gene", "biolink:NamedThing", "biolink:Gene", "biolink:Entity"]) == [
+        "biolink:Gene", "biolink:NamedThing", "biolink:Entity",
+    ]
+
+
+def test_init_logging_configures_once():
+    logger = LoggingUtil.init_logging()
+    handlers = list(logger.handlers)
+    assert LoggingUtil.init_logging() is logger
+    assert logger.handlers == handlers
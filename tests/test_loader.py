@@ -1,11 +1,16 @@
+import json
+from collections import Counter, defaultdict
 from pathlib import Path
 from unittest.mock import patch
 
+import orjson
 import pytest
+import redis
+import zstandard
 
 import node_normalizer.loader.loader as loader_mod
 from node_normalizer.loader import get_compendia, load_compendium, validate_compendium
-from node_normalizer.loader.loader import _accumulate_source_prefixes
+from node_normalizer.loader.loader import _accumulate_source_prefixes, merge_semantic_meta_data
 
 
 good_json = Path(__file__).parent / "resources" / "datafile.json"
@@ -13,8 +18,8 @@ bad_json = Path(__file__).parent / "resources" / "datafile_with_errors.json"
 
 
 def test_nn_load():
-    # test_mode=1 buffers pipeline commands but never executes them, so no
-    # running Redis is required.
+    # test_mode=1 buffers the writes but never sends them, so no running Redis
+    # is required.
     source_prefixes = load_compendium(good_json, 5, test_mode=1)
     assert source_prefixes
 
@@ -31,23 +36,24 @@ def test_get_compendia_raises_on_missing_file(tmp_path):
         get_compendia(tmp_path, ["does_not_exist.txt"])
 
 
-class _FakePipeline:
-    def __init__(self, parent):
-        self.parent = parent
-
-    def set(self, key, value):
-        self.parent.sets.append((key, value))
-
-    def execute(self):
-        return []
-
-
 class _FakeRedis:
     def __init__(self):
         self.sets = []
+        self.mset_calls = 0
+
+    def mset(self, mapping):
+        self.mset_calls += 1
+        self.sets.extend(mapping.items())
+
+    def set(self, key, value):
+        self.sets.append((key, value))
 
     def pipeline(self, transaction=True):
-        return _FakePipeline(self)
+        # Commands are applied immediately; good enough for counting writes.
+        return self
+
+    def execute(self):
+        return []
 
 
 def test_one_set_per_line():
@@ -69,13 +75,145 @@ def test_one_set_per_line():
     assert len(fakes["id_to_type_db"].sets) == num_lines
 
 
+def test_mset_flush_writes_every_key():
+    """
+    The buffered MSET flush must not drop data: with a block size that does not
+    divide the line count, every key still lands (the remainder goes out in the
+    final flush), each block is one MSET per database, and the values match what
+    per-key SETs would have written.
+    """
+    fakes = {}
+
+    def fake_connect(db_name):
+        return fakes.setdefault(db_name, _FakeRedis())
+
+    with patch.object(loader_mod, "redis_connect", fake_connect):
+        load_compendium(good_json, block_size=2, test_mode=0)
+
+    lines = [json.loads(line) for line in open(good_json) if line.strip()]
+    expected_term2id = {eq["i"].upper(): line["identifiers"][0]["i"] for line in lines for eq in line["identifiers"]}
+    expected_types = {line["identifiers"][0]["i"]: line["type"] for line in lines}
+
+    assert dict(fakes["eq_id_to_id_db"].sets) == expected_term2id
+    assert dict(fakes["id_to_type_db"].sets) == expected_types
+    assert {key: json.loads(value) for key, value in fakes["id_to_eqids_db"].sets} == {
+        line["identifiers"][0]["i"]: line["identifiers"] for line in lines
+    }
+    assert fakes["id_to_type_db"].mset_calls == -(-len(lines) // 2)
+
+
+def test_load_all_parallel_compendia(tmp_path):
+    """
+    Compendia loaded side by side still get one file-* entry each, written in
+    the config's order, and one compendium failing fails the whole load.
+    """
+    lines = [line for line in open(good_json) if line.strip()]
+    (tmp_path / "full.txt").write_text("".join(lines))
+    (tmp_path / "short.txt").write_text("".join(lines[:2]))
+    config = {
+        "compendium_directory": str(tmp_path),
+        "conflation_directory": str(tmp_path),
+        "test_mode": 0,
+        "data_files": ["full.txt", "short.txt"],
+        "conflations": [],
+    }
+    expected = [
+        (f"file-{tmp_path / name}", orjson.dumps({"source_prefixes": load_compendium(tmp_path / name, 2, test_mode=1)}))
+        for name in config["data_files"]
+    ]
+
+    fakes = {}
+
+    def fake_connect(db_name):
+        return fakes.setdefault(db_name, _FakeRedis())
+
+    with patch.object(loader_mod, "redis_connect", fake_connect), \
+            patch.object(loader_mod, "get_config", lambda: config), \
+            patch.object(loader_mod, "disable_periodic_save", lambda: None), \
+            patch.object(loader_mod, "merge_semantic_meta_data", lambda test_mode: None):
+        assert loader_mod.load_all(block_size=2, max_parallel_compendia=2)
+
+        assert fakes["curie_to_bl_type_db"].sets == expected
+        assert len(fakes["id_to_type_db"].sets) == len(lines) + 2
+
+        real_load_compendium = loader_mod.load_compendium
+
+        def load_or_fail(comp, *args):
+            if comp.name == "short.txt":
+                raise redis.ConnectionError("connection lost")
+            return real_load_compendium(comp, *args)
+
+        with patch.object(loader_mod, "load_compendium", load_or_fail):
+            with pytest.raises(redis.ConnectionError):
+                loader_mod.load_all(block_size=2, max_parallel_compendia=2)
+
+
+def test_mset_chunks_large_blocks():
+    """A block with more pairs than MSET_CHUNK_SIZE is split across several MSETs without losing keys."""
+    fakes = {}
+
+    def fake_connect(db_name):
+        return fakes.setdefault(db_name, _FakeRedis())
+
+    with patch.object(loader_mod, "redis_connect", fake_connect), patch.object(loader_mod, "MSET_CHUNK_SIZE", 2):
+        load_compendium(good_json, block_size=1000, test_mode=0)
+
+    lines = [json.loads(line) for line in open(good_json) if line.strip()]
+    expected_term2id = {eq["i"].upper(): line["identifiers"][0]["i"] for line in lines for eq in line["identifiers"]}
+
+    assert dict(fakes["eq_id_to_id_db"].sets) == expected_term2id
+    assert fakes["eq_id_to_id_db"].mset_calls == -(-len(expected_term2id) // 2)
+    assert len(fakes["id_to_type_db"].sets) == len(lines)
+
+
+def test_failed_block_write_is_raised():
+    """A block write that fails on the background writer thread must fail the load, not be dropped."""
+
+    failures = [redis.ConnectionError("connection lost")]
+
+    class _FailOnceRedis(_FakeRedis):
+        # Only the very first MSET fails. It belongs to the first block, which is
+        # written on the background thread, so the load can only raise if that
+        # thread's error is re-raised.
+        def mset(self, mapping):
+            if failures:
+                raise failures.pop()
+            super().mset(mapping)
+
+    fakes = {}
+
+    def fake_connect(db_name):
+        return fakes.setdefault(db_name, _FailOnceRedis())
+
+    with patch.object(loader_mod, "redis_connect", fake_connect):
+        with pytest.raises(redis.ConnectionError):
+            load_compendium(good_json, block_size=2, test_mode=0)
+
+
+def test_compress_eqids_writes_zstd_json():
+    """With compress_eqids, id_to_eqids_db values are zstd frames of the same JSON."""
+    fakes = {}
+
+    def fake_connect(db_name):
+        return fakes.setdefault(db_name, _FakeRedis())
+
+    with patch.object(loader_mod, "redis_connect", fake_connect):
+        load_compendium(good_json, block_size=2, test_mode=0, compress_eqids=True)
+
+    lines = [json.loads(line) for line in open(good_json) if line.strip()]
+    decompressor = zstandard.ZstdDecompressor()
+    assert {key: json.loads(decompressor.decompress(value)) for key, value in fakes["id_to_eqids_db"].sets} == {
+        line["identifiers"][0]["i"]: line["identifiers"] for line in lines
+    }
+
+
 def test_accumulate_source_prefixes():
     """
     The per-line prefix counter must fold each identifier's prefix into every
     implied semantic type, accumulating across lines. This pins the behaviour
     of the optimized (count-once-per-line) accumulation.
     """
-    source_prefixes = {}
+    source_prefixes = defaultdict(Counter)
 
     # Line 1: two NCBIGene + one ENSEMBL, implied by Gene and its ancestors.
     _accumulate_source_prefixes(
@@ -94,3 +232,123 @@ def test_accumulate_source_prefixes():
         "biolink:Gene": {"NCBIGene": 3, "ENSEMBL": 1},
         "biolink:BiologicalEntity": {"NCBIGene": 2, "ENSEMBL": 1},
     }
+
+
+class _FakeMetaRedis:
+    """
+    Just enough of a redis-py client for merge_semantic_meta_data. Replies are
+    bytes, as with the loader's real clients (decode_responses is off).
+    """
+
+    def __init__(self, data):
+        self.data = dict(data)
+        self.mget_calls = []
+        # (transaction, [command names]) for each executed pipeline.
+        self.executed = []
+
+    def keys(self, pattern):
+        prefix = pattern.rstrip("*")
+        return [key.encode() for key in self.data if key.startswith(prefix)]
+
+    def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        return [self.data.get(key.decode()) for key in keys]
+
+    def type(self, key):
+        value = self.data.get(key)
+        if value is None:
+            return b"none"
+        if isinstance(value, list):
+            return b"list"
+        if isinstance(value, set):
+            return b"set"
+        return b"string"
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def sadd(self, key, *members):
+        if isinstance(self.data.get(key), list):
+            raise redis.ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        self.data.setdefault(key, set()).update(members)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return _FakeMetaPipeline(self, transaction)
+
+
+class _FakeMetaPipeline:
+    """Queues write commands and applies them to the client only on execute()."""
+
+    def __init__(self, client, transaction):
+        self.client = client
+        self.transaction = transaction
+        self.commands = []
+
+    def delete(self, key):
+        self.commands.append(("delete", key))
+
+    def sadd(self, key, *members):
+        self.commands.append(("sadd", key, *members))
+
+    def set(self, key, value):
+        self.commands.append(("set", key, value))
+
+    def execute(self):
+        self.client.executed.append((self.transaction, [name for name, *_ in self.commands]))
+        for name, *args in self.commands:
+            getattr(self.client, name)(*args)
+        return []
+
+
+def test_merge_semantic_meta_data_replaces_legacy_list():
+    """
+    Databases loaded before semantic_types became a SET hold a LIST with one copy
+    of each type per file. The merge must turn it into a SET of every type, sum
+    the per-file prefix counts, and change nothing when run again.
+    """
+    fake = _FakeMetaRedis({
+        "semantic_types": ["biolink:Gene", "biolink:Gene"],
+        "file-Gene.txt": orjson.dumps({"source_prefixes": {"biolink:Gene": {"NCBIGene": 2}}}),
+        "file-Protein.txt": orjson.dumps({"source_prefixes": {
+            "biolink:Gene": {"NCBIGene": 1, "ENSEMBL": 1},
+            "biolink:Protein": {"UniProtKB": 3},
+        }}),
+    })
+
+    with patch.object(loader_mod, "redis_connect", lambda db_name: fake):
+        merge_semantic_meta_data()
+        assert fake.data["semantic_types"] == {"biolink:Gene", "biolink:Protein"}
+        assert orjson.loads(fake.data["biolink:Gene"]) == {"NCBIGene": 3, "ENSEMBL": 1}
+        assert orjson.loads(fake.data["biolink:Protein"]) == {"UniProtKB": 3}
+
+        # The legacy LIST is deleted and replaced inside one transaction, so a
+        # live frontend never sees semantic_types missing.
+        assert fake.executed == [(True, ["delete", "sadd", "set", "set"])]
+
+        merged = dict(fake.data)
+        merge_semantic_meta_data()
+        assert fake.data == merged
+        assert fake.executed[1] == (True, ["sadd", "set", "set"])
+
+
+def test_merge_semantic_meta_data_reads_file_entries_with_one_mget():
+    """All file-* entries come back in a single MGET (keyed by the bytes KEYS returns); with none, MGET is skipped."""
+    file_entries = {
+        "file-Gene.txt": orjson.dumps({"source_prefixes": {"biolink:Gene": {"NCBIGene": 2}}}),
+        "file-Protein.txt": orjson.dumps({"source_prefixes": {"biolink:Protein": {"UniProtKB": 3}}}),
+    }
+    fake = _FakeMetaRedis(file_entries)
+    with patch.object(loader_mod, "redis_connect", lambda db_name: fake):
+        merge_semantic_meta_data()
+    assert fake.mget_calls == [[b"file-Gene.txt", b"file-Protein.txt"]]
+    assert fake.data["semantic_types"] == {"biolink:Gene", "biolink:Protein"}
+
+    # MGET with no keys is a Redis error, so an empty database must not issue one.
+    empty = _FakeMetaRedis({})
+    with patch.object(loader_mod, "redis_connect", lambda db_name: empty):
+        merge_semantic_meta_data()
+    assert empty.mget_calls == []
+    assert empty.data == {}